@@ -0,0 +1,256 @@
+# Copyright (c) 2025 dev-droid. All rights reserved.
+# Licensed under the MIT License. See LICENSE file in the project root for details.
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Optional
+
+# Lower value = served first. Web UI requests jump ahead of batch jobs.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+# A local Ollama effectively generates one answer at a time.
+# Cloud APIs tolerate a few parallel calls.
+BACKEND_LIMITS = {"ollama": 1}
+DEFAULT_LIMIT = 4
+
+
+def backend_of(model: str) -> str:
+    """
+    Returns the backend name for a model id, e.g. 'ollama/llama3' -> 'ollama'.
+    """
+    return model.split("/", 1)[0] if "/" in model else model
+
+
+@dataclass
+class AdmissionStats:
+    backend: str
+    queue_depth: int = 0  # running + queued requests that will be served before this one (on arrival)
+    wait_seconds: float = 0.0  # time spent before the backend call started (or coalesced result arrived)
+    coalesced: bool = False  # True if the result was shared with an identical in-flight prompt
+
+
+def _resolve(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class _Signal:
+    """
+    A one-shot event that threads can wait on and asyncio code can await (without holding a thread).
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def set(self):
+        with self._lock:
+            self._event.set()
+            waiters, self._waiters = self._waiters, []
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def is_set(self) -> bool:
+        return self._event.is_set()
+
+    def wait(self):
+        self._event.wait()
+
+    async def wait_async(self):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._waiters.append((loop, future))
+        await future
+
+
+class _Ticket:
+    def __init__(self, priority: int, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.granted = _Signal()
+
+    def __lt__(self, other):
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class _Backend:
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self.coalesced = 0  # followers waiting on an identical in-flight request
+        self.queue: list[_Ticket] = []
+
+
+class _Call:
+    def __init__(self, ticket: _Ticket):
+        self.ticket = ticket
+        self.done = _Signal()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class AdmissionController:
+    """
+    Shared admission layer in front of the LLM backends.
+
+    - Identical in-flight requests (same key) are computed once and shared (singleflight).
+    - Each backend has a concurrency limit; extra requests wait in a priority queue.
+
+    Threaded callers use run(); asyncio callers (the web UI) use run_async(), which waits in
+    the queue without occupying a worker thread, so every waiting request is visible here.
+
+    Limits and coalescing apply within one process only: a CLI run or a separate batch
+    worker process has its own controller and does not wait behind the web server's queue.
+    """
+
+    def __init__(self, limits: Optional[dict] = None, default_limit: int = DEFAULT_LIMIT):
+        self._limits = dict(BACKEND_LIMITS if limits is None else limits)
+        self._default_limit = default_limit
+        self._lock = threading.Lock()
+        self._backends: dict[str, _Backend] = {}
+        self._inflight: dict[Hashable, _Call] = {}
+        self._seq = itertools.count()
+
+    def _backend(self, name: str) -> _Backend:
+        backend = self._backends.get(name)
+        if backend is None:
+            backend = _Backend(self._limits.get(name, self._default_limit))
+            self._backends[name] = backend
+        return backend
+
+    def _dispatch(self, backend: _Backend):
+        # Caller holds self._lock.
+        while backend.active < backend.limit and backend.queue:
+            ticket = heapq.heappop(backend.queue)
+            backend.active += 1
+            ticket.granted.set()
+
+    def _enter(self, key: Hashable, backend_name: str, priority: int,
+               stats: AdmissionStats) -> tuple[bool, _Call, _Backend]:
+        """
+        Joins an identical in-flight call or queues a new one. Returns (leader, call, backend).
+        """
+        with self._lock:
+            backend = self._backend(backend_name)
+            call = self._inflight.get(key)
+            if call is not None:
+                leader = False
+                stats.coalesced = True
+                backend.coalesced += 1
+                # An interactive follower promotes a still-queued batch leader.
+                ticket = call.ticket
+                if priority < ticket.priority and not ticket.granted.is_set():
+                    ticket.priority = priority
+                    heapq.heapify(backend.queue)
+            else:
+                leader = True
+                ticket = _Ticket(priority, next(self._seq))
+                call = _Call(ticket)
+                self._inflight[key] = call
+                heapq.heappush(backend.queue, ticket)
+                self._dispatch(backend)
+            # A waiting request is behind everything running plus the tickets that sort before
+            # ours (or before the leader's, if coalesced)
+            if not ticket.granted.is_set():
+                stats.queue_depth = backend.active + sum(1 for t in backend.queue if t < ticket)
+        return leader, call, backend
+
+    def _finish(self, key: Hashable, backend: _Backend, call: _Call):
+        with self._lock:
+            del self._inflight[key]
+            backend.active -= 1
+            self._dispatch(backend)
+        call.done.set()
+
+    def _leave(self, backend: _Backend):
+        with self._lock:
+            backend.coalesced -= 1
+
+    @staticmethod
+    def _outcome(call: _Call, stats: AdmissionStats) -> tuple[Any, AdmissionStats]:
+        if call.error is not None:
+            raise call.error
+        return call.result, stats
+
+    def run(self, key: Hashable, backend_name: str, fn: Callable[[], Any],
+            priority: int = PRIORITY_BATCH) -> tuple[Any, AdmissionStats]:
+        """
+        Runs fn() under the backend's admission rules.
+        Returns (result, stats). Exceptions raised by fn() propagate to every coalesced caller.
+        """
+        start = time.monotonic()
+        stats = AdmissionStats(backend=backend_name)
+        leader, call, backend = self._enter(key, backend_name, priority, stats)
+
+        if not leader:
+            try:
+                call.done.wait()
+            finally:
+                self._leave(backend)
+            stats.wait_seconds = time.monotonic() - start
+            return self._outcome(call, stats)
+
+        call.ticket.granted.wait()
+        stats.wait_seconds = time.monotonic() - start
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+        finally:
+            self._finish(key, backend, call)
+        return self._outcome(call, stats)
+
+    async def run_async(self, key: Hashable, backend_name: str, fn: Callable[[], Any],
+                        priority: int = PRIORITY_BATCH) -> tuple[Any, AdmissionStats]:
+        """
+        Same as run(), for asyncio code. Queue waits are awaited; only fn() itself runs in a worker thread.
+        """
+        start = time.monotonic()
+        stats = AdmissionStats(backend=backend_name)
+        leader, call, backend = self._enter(key, backend_name, priority, stats)
+
+        if not leader:
+            try:
+                await call.done.wait_async()
+            finally:
+                self._leave(backend)
+            stats.wait_seconds = time.monotonic() - start
+            return self._outcome(call, stats)
+
+        async def lead():
+            await call.ticket.granted.wait_async()
+            stats.wait_seconds = time.monotonic() - start
+            try:
+                call.result = await asyncio.to_thread(fn)
+            except BaseException as e:
+                call.error = e
+            finally:
+                self._finish(key, backend, call)
+
+        # Shielded: if the caller goes away (e.g. the browser tab closes), the queued call still
+        # runs and releases its slot, and any coalesced followers still get the result.
+        await asyncio.shield(lead())
+        return self._outcome(call, stats)
+
+    def snapshot(self) -> dict:
+        """
+        Returns current load per backend: {name: {"active": int, "queued": int, "coalesced": int, "limit": int}}.
+        """
+        with self._lock:
+            return {
+                name: {"active": b.active, "queued": len(b.queue), "coalesced": b.coalesced, "limit": b.limit}
+                for name, b in self._backends.items()
+            }
+
+
+# Process-wide instance shared by the web UI and any batch callers in the same process.
+admission = AdmissionController()
@@ -4,9 +4,13 @@
 from croniter import croniter
 from datetime import datetime
 from crontab import CronTab
+from typing import Optional
 import platform
 import shutil
+import shlex
+import sys
 import os
+import uuid
 
 def validate_expression(expression: str) -> bool:
     """
@@ -30,11 +34,44 @@ def get_next_schedule(expression: str, count: int = 5) -> list[str]:
     except Exception:
         return []
 
-def add_job(expression: str, command: str, comment: str, user: bool = True) -> bool:
+def get_min_interval(expression: str, samples: int = 50) -> Optional[float]:
+    """
+    Returns the shortest gap (in seconds) between consecutive runs over the next 'samples' runs.
+    """
+    if not validate_expression(expression):
+        return None
+
+    try:
+        iter = croniter(expression, datetime.now())
+        runs = [iter.get_next(float) for _ in range(samples + 1)]
+        return min(b - a for a, b in zip(runs, runs[1:]))
+    except Exception:
+        return None
+
+def wrap_command(job_id: str, command: str) -> str:
+    """
+    Wraps a command so it runs through 'ai-cron exec', which records its runtime history.
+    Uses the current interpreter since cron's PATH usually doesn't include the ai-cron script.
+    The package root goes on sys.path inside the wrapper (not PYTHONPATH), so aicron imports
+    from a checkout (cron starts in $HOME) without leaking into the job's own environment.
+    """
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    bootstrap = f"import sys; sys.path.insert(0, {package_root!r}); from aicron.main import app; app()"
+    return (f"{shlex.quote(sys.executable)} -c {shlex.quote(bootstrap)} "
+            f"exec --id {job_id} -- {shlex.quote(command)}")
+
+def add_job(expression: str, command: str, comment: str, user: bool = True, track: bool = False) -> bool:
     """
     Adds a new job to the user's crontab.
     On Windows, if no 'crontab' command is found, falls back to a local file 'cron.tab'.
+    If track is True, the job runs through 'ai-cron exec' and its runs are recorded in the history log.
     """
+    job_id = None
+    if track:
+        job_id = uuid.uuid4().hex[:8]
+        comment = f"{comment} [id={job_id}]"
+    cron_command = wrap_command(job_id, command) if track else command
+
     try:
         if platform.system() == "Windows":
              # Check if crontab executable exists
@@ -53,7 +90,7 @@ def add_job(expression: str, command: str, comment: str, user: bool = True) -> b
         else:
             cron = CronTab(user=user)
 
-        job = cron.new(command=command, comment=comment)
+        job = cron.new(command=cron_command, comment=comment)
         job.setall(expression)
         
         if not job.is_valid():
@@ -61,6 +98,13 @@ def add_job(expression: str, command: str, comment: str, user: bool = True) -> b
             return False
             
         cron.write()
+
+        if track:
+            from .history import register_job
+            try:
+                register_job(job_id, expression, command)
+            except OSError as e:
+                print(f"Warning: could not register job history: {e}")
         return True
     except Exception as e:
         print(f"Error writing to crontab: {e}")
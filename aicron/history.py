@@ -0,0 +1,333 @@
+# Copyright (c) 2025 dev-droid. All rights reserved.
+# Licensed under the MIT License. See LICENSE file in the project root for details.
+
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .cron import get_min_interval
+
+# Number of recent runs kept per job in the index (used for percentiles and overlap checks)
+RECENT_RUNS = 200
+
+# runs.jsonl is compacted (rewritten from the index) once it grows past this size
+LOG_MAX_BYTES = 1024 * 1024
+
+_PROC_AVAILABLE = os.path.exists(f"/proc/{os.getpid()}/status")
+try:
+    with open(f"/proc/{os.getpid()}/cmdline", "rb") as _f:
+        _SELF_CMDLINE = _f.read()
+except OSError:
+    _SELF_CMDLINE = None
+
+
+def history_dir() -> str:
+    """
+    Returns the history directory (AICRON_HOME env var, default ~/.ai-cron).
+    """
+    base = os.environ.get("AICRON_HOME") or os.path.join(os.path.expanduser("~"), ".ai-cron")
+    return os.path.join(base, "history")
+
+
+def _log_path() -> str:
+    return os.path.join(history_dir(), "runs.jsonl")
+
+
+def _index_path() -> str:
+    return os.path.join(history_dir(), "index.json")
+
+
+@contextmanager
+def _locked():
+    """
+    Serializes index updates between concurrently finishing jobs (no-op where fcntl is unavailable).
+    """
+    os.makedirs(history_dir(), exist_ok=True)
+    with open(os.path.join(history_dir(), "index.lock"), "w") as lock_file:
+        if fcntl:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _append_log(record: dict):
+    # Single short line in append mode, so concurrent writers don't interleave
+    line = json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+    with open(_log_path(), "a", encoding="utf-8") as f:
+        f.write(line)
+
+
+def _apply(index: dict, record: dict):
+    """
+    Folds one log record into the rolled-up index.
+    """
+    if "rollup" in record:
+        # Written by compaction: the job's full index entry at that point
+        index[record["id"]] = dict(record["rollup"], recent=[list(r) for r in record["rollup"]["recent"]])
+        return
+    entry = index.setdefault(record["id"], {
+        "cron": None, "command": None, "runs": 0, "failures": 0,
+        "last_start": None, "last_rc": None, "peak_rss_kb": None, "recent": [],
+    })
+    if "reg" in record:
+        entry["cron"] = record.get("cron")
+        entry["command"] = record.get("cmd")
+        return
+    entry["runs"] += 1
+    if record["rc"] != 0:
+        entry["failures"] += 1
+    if entry["last_start"] is None or record["t"] >= entry["last_start"]:
+        entry["last_start"] = record["t"]
+        entry["last_rc"] = record["rc"]
+    if record.get("rss") is not None:
+        entry["peak_rss_kb"] = max(entry["peak_rss_kb"] or 0, record["rss"])
+    entry["recent"].append([record["t"], record["d"]])
+    del entry["recent"][:-RECENT_RUNS]
+
+
+def _write_index(index: dict):
+    tmp = _index_path() + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, _index_path())
+
+
+def rebuild_index() -> dict:
+    """
+    Rebuilds the index from the append-only log (e.g. if index.json was lost or corrupted).
+    """
+    index = {}
+    if os.path.exists(_log_path()):
+        with open(_log_path(), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    _apply(index, json.loads(line))
+                except (ValueError, KeyError):
+                    continue  # Skip a truncated last line
+    _write_index(index)
+    return index
+
+
+def load_index() -> dict:
+    """
+    Returns the rolled-up index: {job_id: {"cron", "command", "runs", "recent": [[start, duration], ...], ...}}.
+    """
+    try:
+        with open(_index_path(), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        if not os.path.exists(_log_path()):
+            return {}
+    except ValueError:
+        pass
+    with _locked():
+        return rebuild_index()
+
+
+def _compact_log(index: dict):
+    """
+    Rewrites runs.jsonl as one rollup record per job (totals plus the last RECENT_RUNS runs).
+    Caller holds the lock.
+    """
+    tmp = _log_path() + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for job_id, entry in index.items():
+            f.write(json.dumps({"id": job_id, "rollup": entry}, ensure_ascii=False, separators=(",", ":")) + "\n")
+    os.replace(tmp, _log_path())
+
+
+def _record(record: dict):
+    with _locked():
+        _append_log(record)
+        try:
+            with open(_index_path(), encoding="utf-8") as f:
+                index = json.load(f)
+        except (FileNotFoundError, ValueError):
+            index = rebuild_index()  # Already includes the record just appended
+        else:
+            _apply(index, record)
+            _write_index(index)
+        # Compact once the log is past the limit and mostly redundant with the index
+        log_size = os.path.getsize(_log_path())
+        if log_size > LOG_MAX_BYTES and log_size > 2 * os.path.getsize(_index_path()):
+            _compact_log(index)
+
+
+def register_job(job_id: str, expression: str, command: str):
+    """
+    Records a job's schedule and command so its runtimes can be compared with the cron interval.
+    """
+    _record({"id": job_id, "reg": round(time.time(), 3), "cron": expression, "cmd": command})
+
+
+def _read_hwm_kb(pid: int) -> Optional[int]:
+    """
+    Returns VmHWM (peak RSS of the current program, reset at exec) from /proc, or None.
+    """
+    try:
+        # Between fork and exec the child still runs our interpreter (shared or copied memory);
+        # its VmHWM would be the wrapper's, so skip it until it has exec'd the job.
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            if f.read() == _SELF_CMDLINE:
+                return None
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _process_tree(pid: int) -> list[int]:
+    pids, todo = [], [pid]
+    while todo:
+        current = todo.pop()
+        pids.append(current)
+        try:
+            with open(f"/proc/{current}/task/{current}/children") as f:
+                todo.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            pass
+    return pids
+
+
+def _sample_peaks(pid: int, peaks: dict):
+    for child in _process_tree(pid):
+        hwm = _read_hwm_kb(child)
+        if hwm is not None:
+            peaks[child] = max(peaks.get(child, 0), hwm)
+
+
+def _rusage_peak_kb() -> Optional[int]:
+    """
+    Fallback where /proc is unavailable. RUSAGE_CHILDREN includes the RSS the child inherited from
+    this (Python) process before exec, so it only says something about the job when it is larger.
+    """
+    if resource is None:
+        return None
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if children <= own:
+        return None
+    # ru_maxrss is in bytes on macOS, kilobytes on Linux
+    return children // 1024 if sys.platform == "darwin" else children
+
+
+def _run_measured(command: str) -> tuple[int, Optional[int]]:
+    """
+    Runs a shell command and returns (exit code, peak RSS in kB of the largest process in its tree).
+    On Linux the job's process tree is sampled from /proc; very short-lived processes may be missed.
+    """
+    proc = subprocess.Popen(command, shell=True)
+    peaks: dict[int, int] = {}
+    interval = 0.01
+    try:
+        while True:
+            if _PROC_AVAILABLE:
+                _sample_peaks(proc.pid, peaks)
+            try:
+                rc = proc.wait(timeout=interval)
+                break
+            except subprocess.TimeoutExpired:
+                interval = min(interval * 2, 0.5)
+    except KeyboardInterrupt:
+        # The job got the same SIGINT; give it a moment to exit on its own
+        try:
+            proc.wait(timeout=0.25)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        rc = 130
+    if peaks:
+        return rc, max(peaks.values())
+    return rc, None if _PROC_AVAILABLE else _rusage_peak_kb()
+
+
+def run_job(job_id: str, command: str) -> int:
+    """
+    Runs a shell command, records start time, duration, exit code and peak RSS, and returns the exit code.
+    """
+    start = time.time()
+    begin = time.monotonic()
+    rc, rss = _run_measured(command)
+    duration = time.monotonic() - begin
+    try:
+        _record({"id": job_id, "t": round(start, 3), "d": round(duration, 3), "rc": rc, "rss": rss})
+    except OSError as e:
+        # Never fail the job itself because history could not be written
+        print(f"ai-cron: could not write history: {e}", file=sys.stderr)
+    return rc
+
+
+def _percentile(sorted_values: list, pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    # Nearest-rank percentile
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def count_overlaps(recent: list) -> int:
+    """
+    Counts runs that started while an earlier run of the same job was still going.
+    """
+    overlaps = 0
+    latest_end = None
+    for start, duration in sorted(recent):
+        if latest_end is not None and start < latest_end:
+            overlaps += 1
+        latest_end = max(latest_end or 0, start + duration)
+    return overlaps
+
+
+def job_summaries() -> list[dict]:
+    """
+    Returns per-job runtime statistics with overlap warnings, compared against each job's cron interval.
+    """
+    summaries = []
+    for job_id, entry in load_index().items():
+        durations = sorted(d for _, d in entry["recent"])
+        interval = get_min_interval(entry["cron"]) if entry.get("cron") else None
+        p95 = _percentile(durations, 95)
+        overlaps = count_overlaps(entry["recent"])
+
+        warnings = []
+        if overlaps:
+            warnings.append(f"{overlaps} 次运行与上一次重叠")
+        if interval and p95 is not None and p95 >= interval:
+            warnings.append(f"p95 耗时 {p95:.1f}s 超过调度间隔 {interval:.0f}s")
+
+        summaries.append({
+            "id": job_id,
+            "cron": entry.get("cron"),
+            "command": entry.get("command"),
+            "runs": entry["runs"],
+            "failures": entry["failures"],
+            "last_start": entry["last_start"],
+            "last_rc": entry["last_rc"],
+            "peak_rss_kb": entry["peak_rss_kb"],
+            "p50": _percentile(durations, 50),
+            "p95": p95,
+            "interval": interval,
+            "overlaps": overlaps,
+            "warnings": warnings,
+        })
+    return summaries
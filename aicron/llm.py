@@ -3,7 +3,7 @@
 
 import os
 import sys
-from typing import Optional
+from typing import Callable, Optional
 
 # Check if litellm is installed
 try:
@@ -17,6 +17,7 @@ except ImportError:
 
 import json
 from .llm_tools import list_dir, find_file
+from .admission import admission, backend_of, AdmissionStats, PRIORITY_BATCH
 
 # Old prompt kept for reference or fallback if needed (though we will switch to JSON primarily)
 LEGACY_PROMPT = """You are a Cron Expression Generator. ..."""
@@ -42,11 +43,55 @@ Rules:
    Actually, let's keep it simple: The prompt will include context from tools if we run them.
 """
 
-def generate_cron(prompt: str, model: str = "ollama/llama3", config: dict = None) -> str:
+def generate_cron(prompt: str, model: str = "ollama/llama3", config: dict = None,
+                  priority: int = PRIORITY_BATCH) -> str:
     """
     Generates a cron expression and command from natural language.
     Returns: JSON string (or plain string if legacy model fails parsing).
     """
+    return generate_cron_with_stats(prompt, model=model, config=config, priority=priority)[0]
+
+def generate_cron_with_stats(prompt: str, model: str = "ollama/llama3", config: dict = None,
+                             priority: int = PRIORITY_BATCH) -> tuple[str, AdmissionStats]:
+    """
+    Same as generate_cron, but also returns the admission stats (queue depth, wait time, coalesced).
+    Backend calls go through the shared admission queue; identical in-flight prompts are computed once.
+    """
+    if model == "mock":
+        return _mock_response(prompt), AdmissionStats(backend="mock")
+    key, call = _prepare_call(prompt, model, config)
+    return admission.run(key, backend_of(model), call, priority=priority)
+
+async def generate_cron_with_stats_async(prompt: str, model: str = "ollama/llama3", config: dict = None,
+                                         priority: int = PRIORITY_BATCH) -> tuple[str, AdmissionStats]:
+    """
+    Async version of generate_cron_with_stats: waits in the admission queue without holding a thread.
+    """
+    if model == "mock":
+        return _mock_response(prompt), AdmissionStats(backend="mock")
+    key, call = _prepare_call(prompt, model, config)
+    return await admission.run_async(key, backend_of(model), call, priority=priority)
+
+def _mock_response(prompt: str) -> str:
+    # Deterministic mock response
+    if "backup" in prompt.lower() or "备份" in prompt:
+         return json.dumps({
+             "cron": "0 0 * * *", 
+             "explanation": "每天午夜运行", 
+             "command": "/usr/bin/tar -czf /backup/archive.tar.gz /var/www/html",
+             "warning": None
+         }, ensure_ascii=False)
+    return json.dumps({
+        "cron": "0 8 * * *", 
+        "explanation": "每天 08:00 运行", 
+        "command": "echo 'Hello World'",
+        "warning": None
+    }, ensure_ascii=False)
+
+def _prepare_call(prompt: str, model: str, config: Optional[dict]) -> tuple[tuple, Callable[[], str]]:
+    """
+    Returns the coalescing key and the blocking backend call for a prompt.
+    """
     use_config = config or {}
     api_base = use_config.get("api_base", "http://localhost:11434" if "ollama" in model else None)
     if not api_base: api_base = None # Ensure empty strings are treated as None for native support
@@ -64,25 +109,13 @@ def generate_cron(prompt: str, model: str = "ollama/llama3", config: dict = None
         {"role": "user", "content": prompt},
     ]
 
-    if model == "mock":
-        # Deterministic mock response
-        if "backup" in prompt.lower() or "备份" in prompt:
-             return json.dumps({
-                 "cron": "0 0 * * *", 
-                 "explanation": "每天午夜运行", 
-                 "command": "/usr/bin/tar -czf /backup/archive.tar.gz /var/www/html",
-                 "warning": None
-             }, ensure_ascii=False)
-        return json.dumps({
-            "cron": "0 8 * * *", 
-            "explanation": "每天 08:00 运行", 
-            "command": "echo 'Hello World'",
-            "warning": None
-        }, ensure_ascii=False)
-
     if completion is None:
         raise ImportError("LiteLLM is not installed.")
 
+    key = (model, api_base, api_key, prompt)
+    return key, lambda: _call_backend(model, messages, api_base, api_key)
+
+def _call_backend(model: str, messages: list, api_base: Optional[str], api_key: Optional[str]) -> str:
     try:
         response = completion(
             model=model, 
@@ -5,7 +5,6 @@ import typer
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Confirm
-from .llm import generate_cron
 from .cron import validate_expression, get_next_schedule, add_job
 
 app = typer.Typer(help="ai-cron: 自然语言转 Cron 表达式。")
@@ -19,15 +18,30 @@ def web(port: int = typer.Option(8080, help="Web server port")):
     from .web import start_web
     start_web(port=port)
 
+@app.command("exec")
+def exec_job(
+    job_id: str = typer.Option(..., "--id", help="任务 ID (由 add_job 生成)"),
+    command: str = typer.Argument(..., help="要运行的 Shell 命令"),
+):
+    """
+    运行命令并记录运行历史 (开始时间、耗时、退出码、峰值内存)。
+    """
+    from .history import run_job
+    raise typer.Exit(code=run_job(job_id, command))
+
 @app.command()
 def main(
     prompt: str = typer.Argument(..., help="自然语言描述的时间计划"),
     model: str = typer.Option("ollama/llama3", help="使用的模型 (默认: ollama/llama3)"),
     dry_run: bool = typer.Option(False, "--dry-run", help="仅显示结果，不写入 Crontab"),
+    track: bool = typer.Option(False, "--track", help="通过 ai-cron exec 运行任务并记录运行历史"),
 ):
     """
     将自然语言转换为 Cron 表达式。
     """
+    # Imported here so 'exec' (run by cron for every tracked job) doesn't load litellm
+    from .llm import generate_cron
+
     with console.status(f"[bold green]思考中... (模型: {model})"):
         result = generate_cron(prompt, model=model)
     
@@ -68,7 +82,7 @@ def main(
             # Let's ask interactively for the command if not provided.
             command_to_run = typer.prompt("请输入要运行的命令")
             
-            success = add_job(expression, command_to_run, "Generated by ai-cron")
+            success = add_job(expression, command_to_run, "Generated by ai-cron", track=track)
             if success:
                 console.print("[bold green]成功添加到 Crontab![/bold green]")
             else:
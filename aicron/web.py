@@ -2,9 +2,11 @@
 # Licensed under the MIT License. See LICENSE file in the project root for details.
 
 from nicegui import ui
-from .llm import generate_cron
+from .llm import generate_cron_with_stats_async
+from .admission import admission, PRIORITY_INTERACTIVE
 from .ollama_utils import check_ollama_installed, check_ollama_running, get_install_guide
 from .llm_tools import list_dir
+from .history import job_summaries
 import time
 import asyncio
 import json
@@ -30,8 +32,17 @@ def index_page():
     with ui.header().classes('items-center justify-between'):
         ui.label('ai-cron Web').classes('text-2xl font-bold')
         with ui.row():
+             queue_badge = ui.badge('队列: 空闲', color='blue').classes('mr-2')
              ui.badge('Local Mode', color='green').classes('mr-4')
 
+    def refresh_queue_badge():
+        snapshot = admission.snapshot()
+        active = sum(b["active"] for b in snapshot.values())
+        queued = sum(b["queued"] for b in snapshot.values())
+        queue_badge.text = f'队列: 运行 {active} / 等待 {queued}' if active or queued else '队列: 空闲'
+
+    ui.timer(1.0, refresh_queue_badge)
+
     # --- Ollama Check ---
     if not check_ollama_installed():
         with ui.dialog() as install_dialog, ui.card():
@@ -47,6 +58,7 @@ def index_page():
     with ui.tabs().classes('w-full') as tabs:
         chat_tab = ui.tab('Chat', label='自然语言生成')
         backup_tab = ui.tab('Backup', label='备份向导')
+        history_tab = ui.tab('History', label='运行历史')
         settings_tab = ui.tab('Settings', label='设置')
 
     with ui.tab_panels(tabs, value=chat_tab).classes('w-full'):
@@ -101,17 +113,18 @@ def index_page():
                     
                     ui.timer(0.1, lambda: process_response(full_prompt, spinner), once=True)
 
-                def process_response(prompt, spinner_elem):
-                    spinner_elem.delete()
-                    
+                async def process_response(prompt, spinner_elem):
                     current_model = app_config["model"]
                     if "ollama" in current_model and not check_ollama_running():
                         effective_model = "mock"
                     else:
                         effective_model = current_model
 
-                    response_str = generate_cron(prompt, model=effective_model, config=app_config)
-                    
+                    # Awaits its turn in the admission queue; only the backend call itself uses a worker thread
+                    response_str, stats = await generate_cron_with_stats_async(
+                        prompt, model=effective_model, config=dict(app_config), priority=PRIORITY_INTERACTIVE)
+                    spinner_elem.delete()
+
                     with chat_container:
                         try:
                             data = json.loads(response_str)
@@ -129,11 +142,18 @@ def index_page():
                                 
                                 if command:
                                     ui.markdown(f"**Command:** `{command}`")
+
+                                if stats.backend != "mock":
+                                    queue_info = f"排队: 前方 {stats.queue_depth} 个请求 · 等待 {stats.wait_seconds:.1f}s"
+                                    if stats.coalesced:
+                                        queue_info += " · 已合并相同请求"
+                                    ui.label(queue_info).classes('text-xs text-gray-500')
                                 
                                 def add_to_system_dialog(expr, cmd):
                                     with ui.dialog() as dialog, ui.card():
                                         ui.label('添加到系统 Crontab')
                                         cmd_input = ui.input('要运行的命令', value=cmd).classes('w-full')
+                                        track_input = ui.checkbox('记录运行历史 (通过 ai-cron exec 运行)', value=False)
                                         
                                         def do_add():
                                             final_cmd = cmd_input.value
@@ -142,7 +162,7 @@ def index_page():
                                                 return
                                             
                                             from .cron import add_job
-                                            success = add_job(expr, final_cmd, "Generated by ai-cron Web")
+                                            success = add_job(expr, final_cmd, "Generated by ai-cron Web", track=track_input.value)
                                             
                                             if success:
                                                 ui.notify('成功添加到系统 Crontab!', type='positive')
@@ -210,7 +230,50 @@ def index_page():
                         ui.button('开始测试', on_click=run_backup_test)
                         ui.button('上一步', on_click=stepper.previous).props('flat')
 
-        # --- Tab 3: Settings ---
+        # --- Tab 3: Run History ---
+        with ui.tab_panel(history_tab):
+            ui.markdown("## 运行历史")
+            ui.label('通过 ai-cron exec 运行的任务的耗时统计，与调度间隔对比。').classes('text-gray-500')
+
+            def fmt_seconds(value):
+                return '-' if value is None else f'{value:.1f}s'
+
+            def history_rows():
+                rows = []
+                for s in job_summaries():
+                    rows.append({
+                        'id': s['id'],
+                        'cron': s['cron'] or '-',
+                        'command': s['command'] or '-',
+                        'runs': f"{s['runs']} ({s['failures']} 失败)" if s['failures'] else s['runs'],
+                        'p50': fmt_seconds(s['p50']),
+                        'p95': fmt_seconds(s['p95']),
+                        'interval': fmt_seconds(s['interval']),
+                        'rss': '-' if s['peak_rss_kb'] is None else f"{s['peak_rss_kb'] / 1024:.1f} MB",
+                        'warnings': '; '.join(s['warnings']) or '-',
+                    })
+                return rows
+
+            history_columns = [
+                {'name': 'id', 'label': 'ID', 'field': 'id'},
+                {'name': 'cron', 'label': 'Cron', 'field': 'cron'},
+                {'name': 'command', 'label': '命令', 'field': 'command', 'align': 'left'},
+                {'name': 'runs', 'label': '运行次数', 'field': 'runs'},
+                {'name': 'p50', 'label': 'p50', 'field': 'p50'},
+                {'name': 'p95', 'label': 'p95', 'field': 'p95'},
+                {'name': 'interval', 'label': '最短间隔', 'field': 'interval'},
+                {'name': 'rss', 'label': '峰值内存', 'field': 'rss'},
+                {'name': 'warnings', 'label': '重叠警告', 'field': 'warnings', 'align': 'left'},
+            ]
+            history_table = ui.table(columns=history_columns, rows=history_rows(), row_key='id').classes('w-full')
+
+            def refresh_history():
+                history_table.rows = history_rows()
+                history_table.update()
+
+            ui.button('刷新', icon='refresh', on_click=refresh_history).classes('mt-4')
+
+        # --- Tab 4: Settings ---
         with ui.tab_panel(settings_tab):
             ui.markdown("## AI 配置")
             
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+import unittest
+from unittest.mock import patch, MagicMock
+from aicron.admission import AdmissionController, backend_of, PRIORITY_INTERACTIVE, PRIORITY_BATCH
+from aicron.llm import generate_cron_with_stats
+
+def wait_until(condition, timeout=5.0):
+    # Poll instead of sleeping a fixed time, so slow CI machines don't cause flakes
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("Timed out waiting for condition")
+        time.sleep(0.005)
+
+class TestAdmission(unittest.TestCase):
+
+    def test_backend_of(self):
+        self.assertEqual(backend_of("ollama/llama3"), "ollama")
+        self.assertEqual(backend_of("mock"), "mock")
+
+    def test_coalesces_identical_inflight_requests(self):
+        controller = AdmissionController()
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return "result"
+
+        results = []
+        def call():
+            results.append(controller.run("same", "ollama", slow))
+
+        leader = threading.Thread(target=call)
+        leader.start()
+        self.assertTrue(started.wait(5))
+        followers = [threading.Thread(target=call) for _ in range(2)]
+        for t in followers:
+            t.start()
+        wait_until(lambda: controller.snapshot()["ollama"]["coalesced"] == 2)
+        release.set()
+        for t in [leader] + followers:
+            t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r for r, _ in results], ["result"] * 3)
+        self.assertEqual(sum(s.coalesced for _, s in results), 2)
+        self.assertEqual(controller.snapshot()["ollama"]["coalesced"], 0)
+
+    def test_interactive_goes_ahead_of_batch(self):
+        controller = AdmissionController(limits={"ollama": 1})
+        started = threading.Event()
+        release = threading.Event()
+        order = []
+        stats = {}
+
+        def job(name, wait=False):
+            def fn():
+                if wait:
+                    started.set()
+                    release.wait(5)
+                order.append(name)
+            return fn
+
+        def submit(name, priority, wait=False):
+            stats[name] = controller.run(name, "ollama", job(name, wait), priority)[1]
+
+        def queued():
+            return controller.snapshot()["ollama"]["queued"]
+
+        blocker = threading.Thread(target=submit, args=("blocker", PRIORITY_BATCH, True))
+        blocker.start()
+        self.assertTrue(started.wait(5))
+        batch = [threading.Thread(target=submit, args=(f"batch{i}", PRIORITY_BATCH)) for i in range(2)]
+        for i, t in enumerate(batch):
+            t.start()
+            wait_until(lambda: queued() == i + 1)
+        interactive = threading.Thread(target=submit, args=("web", PRIORITY_INTERACTIVE))
+        interactive.start()
+        wait_until(lambda: queued() == 3)
+
+        self.assertEqual(controller.snapshot()["ollama"]["active"], 1)
+        release.set()
+        for t in [blocker, interactive] + batch:
+            t.join()
+        self.assertEqual(order, ["blocker", "web", "batch0", "batch1"])
+        # Queue depth counts the running request plus queued requests that will be served first
+        self.assertEqual(stats["blocker"].queue_depth, 0)
+        self.assertEqual(stats["batch1"].queue_depth, 2)
+        self.assertEqual(stats["web"].queue_depth, 1)
+
+    def test_async_waiters_queue_without_threads(self):
+        controller = AdmissionController(limits={"ollama": 1})
+        started = threading.Event()
+        release = threading.Event()
+        order = []
+
+        def blocking():
+            started.set()
+            release.wait(5)
+
+        blocker = threading.Thread(target=controller.run, args=("blocker", "ollama", blocking))
+        blocker.start()
+        self.assertTrue(started.wait(5))
+
+        async def main():
+            threads_before = threading.active_count()
+            tasks = [
+                asyncio.create_task(controller.run_async(
+                    f"req{i}", "ollama", lambda i=i: order.append(i),
+                    PRIORITY_INTERACTIVE if i % 2 else PRIORITY_BATCH))
+                for i in range(20)
+            ]
+            while controller.snapshot()["ollama"]["queued"] < 20:
+                await asyncio.sleep(0.005)
+            # Every waiter is in the admission queue, none is parked on a worker thread
+            self.assertEqual(threading.active_count(), threads_before)
+            release.set()
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(main())
+        blocker.join()
+
+        self.assertEqual(order, [i for i in range(20) if i % 2] + [i for i in range(20) if not i % 2])
+        self.assertEqual(results[0][1].queue_depth, 1)
+        self.assertGreater(results[0][1].wait_seconds, 0)
+        self.assertEqual(controller.snapshot()["ollama"]["active"], 0)
+
+    def test_async_coalescing(self):
+        controller = AdmissionController()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            time.sleep(0.05)
+            return "result"
+
+        async def main():
+            return await asyncio.gather(*(controller.run_async("same", "ollama", fn) for _ in range(3)))
+
+        results = asyncio.run(main())
+        self.assertEqual(len(calls), 1)
+        self.assertEqual([r for r, _ in results], ["result"] * 3)
+        self.assertEqual(sum(s.coalesced for _, s in results), 2)
+
+    def test_error_propagates_and_frees_slot(self):
+        controller = AdmissionController(limits={"ollama": 1})
+
+        def boom():
+            raise RuntimeError("backend down")
+
+        with self.assertRaises(RuntimeError):
+            controller.run("k", "ollama", boom)
+        self.assertEqual(controller.snapshot()["ollama"]["active"], 0)
+        self.assertEqual(controller.run("k", "ollama", lambda: "ok")[0], "ok")
+
+    @patch('aicron.llm.completion')
+    def test_generate_cron_reports_stats(self, mock_completion):
+        mock_response = MagicMock()
+        mock_response.choices[0].message.content = '{"cron": "0 8 * * *"}'
+        mock_completion.return_value = mock_response
+
+        result, stats = generate_cron_with_stats("Every day at 8am", model="ollama/llama3")
+
+        self.assertEqual(result, '{"cron": "0 8 * * *"}')
+        self.assertEqual(stats.backend, "ollama")
+        self.assertFalse(stats.coalesced)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,166 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+from crontab import CronTab
+from aicron import history
+from aicron.cron import get_min_interval, wrap_command, add_job
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {"AICRON_HOME": self.tmp.name})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def test_run_job_records_exit_code_and_duration(self):
+        history.register_job("job1", "*/5 * * * *", "exit 3")
+        rc = history.run_job("job1", f"{sys.executable} -c \"import sys; sys.exit(3)\"")
+
+        self.assertEqual(rc, 3)
+        entry = history.load_index()["job1"]
+        self.assertEqual(entry["cron"], "*/5 * * * *")
+        self.assertEqual(entry["runs"], 1)
+        self.assertEqual(entry["failures"], 1)
+        self.assertEqual(entry["last_rc"], 3)
+        self.assertEqual(len(entry["recent"]), 1)
+
+    def test_trivial_job_does_not_report_interpreter_rss(self):
+        import resource
+        own_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        for job_id, command in (("true", "true"), ("sleep", "sleep 0.2; true")):
+            history.run_job(job_id, command)
+            rss = history.load_index()[job_id]["peak_rss_kb"]
+            self.assertTrue(rss is None or rss < own_rss / 2, f"{command}: {rss} kB vs interpreter {own_rss} kB")
+
+    @unittest.skipUnless(os.path.exists("/proc/self/status"), "needs /proc")
+    def test_job_memory_is_measured(self):
+        command = f"{sys.executable} -c \"import time; b = bytearray(80 * 1024 * 1024); time.sleep(0.5)\""
+        history.run_job("big", command)
+        self.assertGreaterEqual(history.load_index()["big"]["peak_rss_kb"], 80 * 1024)
+
+    def test_index_rebuilt_from_log(self):
+        history.register_job("job1", "0 * * * *", "true")
+        history.run_job("job1", "true")
+        history.run_job("job1", "true")
+        os.remove(os.path.join(history.history_dir(), "index.json"))
+
+        entry = history.load_index()["job1"]
+        self.assertEqual(entry["runs"], 2)
+        self.assertEqual(entry["cron"], "0 * * * *")
+
+    def test_log_compacted_past_size_limit(self):
+        history.register_job("job1", "* * * * *", "true")
+        with patch.object(history, "LOG_MAX_BYTES", 2000), patch.object(history, "RECENT_RUNS", 5):
+            for i in range(100):
+                history._record({"id": "job1", "t": i * 60, "d": 1.5, "rc": 1 if i % 10 == 0 else 0, "rss": 1000 + i})
+            log_path = os.path.join(history.history_dir(), "runs.jsonl")
+            self.assertLess(os.path.getsize(log_path), 3000)
+
+            index = history.load_index()
+            os.remove(os.path.join(history.history_dir(), "index.json"))
+            rebuilt = history.load_index()
+
+        self.assertEqual(rebuilt, index)
+        entry = rebuilt["job1"]
+        self.assertEqual(entry["runs"], 100)
+        self.assertEqual(entry["failures"], 10)
+        self.assertEqual(entry["peak_rss_kb"], 1099)
+        self.assertEqual(entry["cron"], "* * * * *")
+        self.assertEqual([t for t, _ in entry["recent"]], [i * 60 for i in range(95, 100)])
+
+    def test_summaries_percentiles_and_warnings(self):
+        index = {}
+        history._apply(index, {"id": "j", "reg": 0, "cron": "* * * * *", "cmd": "sleep"})
+        # Runs every minute; two of them take longer than the interval and overlap the next one
+        for i, duration in enumerate([10, 10, 10, 90, 90]):
+            history._apply(index, {"id": "j", "t": i * 60, "d": duration, "rc": 0, "rss": 1024})
+        os.makedirs(history.history_dir(), exist_ok=True)
+        history._write_index(index)
+
+        summary = history.job_summaries()[0]
+        self.assertEqual(summary["p50"], 10)
+        self.assertEqual(summary["p95"], 90)
+        self.assertEqual(summary["interval"], 60)
+        self.assertEqual(summary["overlaps"], 1)
+        self.assertEqual(len(summary["warnings"]), 2)
+
+    def test_count_overlaps(self):
+        self.assertEqual(history.count_overlaps([[0, 5], [10, 5], [20, 5]]), 0)
+        self.assertEqual(history.count_overlaps([[0, 100], [60, 5], [70, 5]]), 2)
+
+class TestExecWrapper(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.env = patch.dict(os.environ, {"AICRON_HOME": self.tmp.name})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.tmp.cleanup()
+
+    def test_wrapped_command_runs_from_other_directory(self):
+        # Cron starts jobs in $HOME, where aicron may not be importable without the wrapper's sys.path bootstrap
+        env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+        wrapped = wrap_command("job1", "echo 'it ran' > out.txt; exit 4")
+        proc = subprocess.run(wrapped, shell=True, cwd=self.tmp.name, env=env, capture_output=True, text=True)
+
+        self.assertEqual(proc.returncode, 4, proc.stderr)
+        with open(os.path.join(self.tmp.name, "out.txt")) as f:
+            self.assertEqual(f.read().strip(), "it ran")
+        entry = history.load_index()["job1"]
+        self.assertEqual(entry["runs"], 1)
+        self.assertEqual(entry["last_rc"], 4)
+
+    def test_wrapped_job_keeps_caller_pythonpath(self):
+        out = os.path.join(self.tmp.name, "pythonpath.txt")
+        wrapped = wrap_command("job1", f'printf "%s" "${{PYTHONPATH-unset}}" > {out}')
+        for pythonpath in (None, "/opt/custom"):
+            env = {k: v for k, v in os.environ.items() if k != "PYTHONPATH"}
+            if pythonpath:
+                env["PYTHONPATH"] = pythonpath
+            proc = subprocess.run(wrapped, shell=True, cwd=self.tmp.name, env=env, capture_output=True, text=True)
+            self.assertEqual(proc.returncode, 0, proc.stderr)
+            with open(out) as f:
+                self.assertEqual(f.read(), pythonpath or "unset")
+
+    def test_exec_does_not_load_llm(self):
+        code = "import sys, aicron.main; print('aicron.llm' in sys.modules)"
+        proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+        self.assertEqual(proc.stdout.strip(), "False", proc.stderr)
+
+    def test_add_job_track_writes_wrapped_command(self):
+        tab_file = os.path.join(self.tmp.name, "cron.tab")
+        open(tab_file, "w").close()
+
+        with patch("aicron.cron.CronTab", side_effect=lambda **kwargs: CronTab(tabfile=tab_file)):
+            self.assertTrue(add_job("*/5 * * * *", "echo hi", "Generated by ai-cron", track=True))
+
+        jobs = list(CronTab(tabfile=tab_file))
+        self.assertEqual(len(jobs), 1)
+        job_id = next(iter(history.load_index()))
+        self.assertEqual(jobs[0].comment, f"Generated by ai-cron [id={job_id}]")
+        self.assertEqual(jobs[0].command, wrap_command(job_id, "echo hi"))
+        self.assertEqual(history.load_index()[job_id]["command"], "echo hi")
+
+class TestCronHelpers(unittest.TestCase):
+
+    def test_get_min_interval(self):
+        self.assertEqual(get_min_interval("*/15 * * * *"), 900)
+        self.assertEqual(get_min_interval("0 8,9 * * *"), 3600)
+        self.assertIsNone(get_min_interval("not a cron"))
+
+    def test_wrap_command_quotes_original(self):
+        wrapped = wrap_command("abc123", "tar -czf '/backup/a b.tgz' /data")
+        self.assertIn("from aicron.main import app; app()' exec --id abc123 -- ", wrapped)
+        self.assertIn("'tar -czf '\"'\"'/backup/a b.tgz'\"'\"' /data'", wrapped)
+
+if __name__ == '__main__':
+    unittest.main()